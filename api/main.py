@@ -5,10 +5,12 @@ from app.database import SessionLocal
 from app import repositories as repo
 from app.schemas import BookSchema
 from sqlalchemy import text
-from app.models import Book
+from app.models import Book, BookTombstone
 from typing import Optional, List
 from app.schemas import (
     BookSchema,
+    BookChangeSchema,
+    BookChangesResponse,
     FeatureResponse,
     TrainingDataResponse,
     PredictionRequest,
@@ -303,6 +305,28 @@ def get_top_rated_books_endpoint(db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
+def validate_price_range(min_price: Optional[float], max_price: Optional[float], required: bool = True):
+    """
+    Valida os limites de preço recebidos na query string
+    """
+    if required and min_price is None and max_price is None:
+        raise HTTPException(
+            status_code=400, 
+            detail="Pelo menos um parâmetro deve ser fornecido (min ou max)"
+        )
+    
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(
+            status_code=400,
+            detail="O preço mínimo não pode ser maior que o preço máximo"
+        )
+    
+    if (min_price is not None and min_price < 0) or (max_price is not None and max_price < 0):
+        raise HTTPException(
+            status_code=400,
+            detail="Os preços não podem ser negativos"
+        )
+
 @app.get("/api/v1/books/price-range", tags=["Opcionais"])
 def get_books_by_price_range(
     min_price: float = Query(None, alias="min", description="Preço mínimo"),
@@ -310,23 +334,7 @@ def get_books_by_price_range(
     db: Session = Depends(get_db)
 ):
     try:
-        if min_price is None and max_price is None:
-            raise HTTPException(
-                status_code=400, 
-                detail="Pelo menos um parâmetro deve ser fornecido (min ou max)"
-            )
-        
-        if min_price is not None and max_price is not None and min_price > max_price:
-            raise HTTPException(
-                status_code=400,
-                detail="O preço mínimo não pode ser maior que o preço máximo"
-            )
-        
-        if (min_price is not None and min_price < 0) or (max_price is not None and max_price < 0):
-            raise HTTPException(
-                status_code=400,
-                detail="Os preços não podem ser negativos"
-            )
+        validate_price_range(min_price, max_price)
         
         query = db.query(Book)
 
@@ -372,6 +380,99 @@ def get_books_by_price_range(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
+@app.get("/api/v1/books/faceted-search", tags=["Opcionais"])
+def faceted_search_endpoint(
+    title: Optional[str] = Query(None, description="Título do livro para busca parcial"),
+    category: Optional[str] = Query(None, description="Categoria do livro para busca parcial"),
+    rating: Optional[int] = Query(None, ge=1, le=5, description="Rating exato"),
+    min_price: Optional[float] = Query(None, alias="min", description="Preço mínimo"),
+    max_price: Optional[float] = Query(None, alias="max", description="Preço máximo"),
+    page: int = Query(1, ge=1, description="Página de resultados"),
+    page_size: int = Query(20, ge=1, le=100, description="Livros por página"),
+    bucket_size: int = Query(10, ge=1, description="Largura das faixas de preço"),
+    db: Session = Depends(get_db)
+):
+    """
+    Busca com filtros combinados, retornando a página de livros e as contagens
+    por categoria, rating e faixa de preço do conjunto filtrado
+    """
+    try:
+        validate_price_range(min_price, max_price, required=False)
+
+        result = repo.faceted_search_books(
+            db,
+            title=title,
+            category=category,
+            rating=rating,
+            min_price=min_price,
+            max_price=max_price,
+            page=page,
+            page_size=page_size,
+            bucket_size=bucket_size,
+        )
+
+        return {
+            "message": f"{result['total']} livro(s) encontrado(s)",
+            "data": [
+                {
+                    "id": book.id,
+                    "titulo": book.titulo,
+                    "preco": float(book.preco) if book.preco is not None else 0.0,
+                    "rating": float(book.rating) if book.rating is not None else 0.0,
+                    "categoria": getattr(book, "categoria", None),
+                }
+                for book in result["books"]
+            ],
+            "total": result["total"],
+            "page": page,
+            "page_size": page_size,
+            "facets": result["facets"],
+            "filters": {
+                "title": title,
+                "category": category,
+                "rating": rating,
+                "min_price": min_price,
+                "max_price": max_price
+            }
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro interno na busca: {str(e)}")
+
+@app.get("/api/v1/books/changes", response_model=BookChangesResponse, tags=["Opcionais"])
+def get_book_changes_endpoint(
+    since: int = Query(0, ge=0, description="Última versão já sincronizada"),
+    limit: int = Query(500, ge=1, le=1000, description="Máximo de alterações por página"),
+    db: Session = Depends(get_db)
+):
+    """
+    Retorna apenas os livros alterados (ou removidos) após a versão informada
+    """
+    try:
+        changes, has_more, next_since = repo.get_book_changes(db, since=since, limit=limit)
+
+        return BookChangesResponse(
+            since=since,
+            next_since=next_since,
+            has_more=has_more,
+            changes=[
+                BookChangeSchema(
+                    id=row.id,
+                    versao=row.versao,
+                    updated_at=row.updated_at,
+                    removido=isinstance(row, BookTombstone),
+                    livro=None if isinstance(row, BookTombstone) else BookSchema.model_validate(row),
+                )
+                for row in changes
+            ]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+
 @app.get("/api/v1/books", response_model=list[BookSchema], tags=["Obrigatório"])
 def read_books(db: Session = Depends(get_db)):
     return repo.get_books(db)
@@ -1,6 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float
+import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, Sequence, text
 from app.database import Base
 
+# Sequência global de versões de alteração (compartilhada por livros e remoções)
+versao_seq = Sequence("books_versao_seq")
+
 class Book(Base):
     __tablename__= "books"
 
@@ -11,5 +15,36 @@ class Book(Base):
     rating = Column(Integer, nullable=False)
     categoria = Column(String, nullable=False)
     imagem = Column(String, nullable=False)
+    versao = Column(
+        BigInteger,
+        versao_seq,
+        nullable=False,
+        index=True,
+        server_default=text("nextval('books_versao_seq')"),
+    )
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.datetime.utcnow,
+        server_default=text("now()"),
+    )
+
 
+class BookTombstone(Base):
+    """Registro de um livro removido, usado pelo feed de alterações"""
+    __tablename__ = "book_tombstones"
 
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    versao = Column(
+        BigInteger,
+        versao_seq,
+        nullable=False,
+        index=True,
+        server_default=text("nextval('books_versao_seq')"),
+    )
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.datetime.utcnow,
+        server_default=text("now()"),
+    )
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
-from app.models import Book
-from sqlalchemy import func
+from app.models import Book, BookTombstone
+from sqlalchemy import false, func, literal_column, select, true, tuple_, union_all
 
 def get_books(db: Session):
     """Retorna todos os livros da base"""
@@ -10,28 +10,214 @@ def get_book_by_id(db: Session, book_id: int):
     """Retorna um livro específico pelo ID"""
     return db.query(Book).filter(Book.id == book_id).first()
 
-def search_books(db: Session, title: str = None, category: str = None):
+def _search_query(
+    db: Session,
+    title: str = None,
+    category: str = None,
+    rating: int = None,
+    min_price: float = None,
+    max_price: float = None,
+):
+    """Monta a consulta filtrada compartilhada pela busca simples e pela facetada"""
+    query = db.query(Book)
+    
+    if title and title.strip():
+        query = query.filter(Book.titulo.ilike(f"%{title.strip()}%"))
+    
+    if category and category.strip():
+        query = query.filter(Book.categoria.ilike(f"%{category.strip()}%"))
+
+    if rating is not None:
+        query = query.filter(Book.rating == rating)
+
+    if min_price is not None:
+        query = query.filter(Book.preco >= min_price)
+
+    if max_price is not None:
+        query = query.filter(Book.preco <= max_price)
+    
+    return query
+
+def search_books(
+    db: Session,
+    title: str = None,
+    category: str = None,
+    rating: int = None,
+    min_price: float = None,
+    max_price: float = None,
+):
     """
-    Busca livros por título e/ou categoria
+    Busca livros por título, categoria, rating e/ou faixa de preço
     
     Args:
         db: Sessão do banco de dados
         title: Título do livro (busca parcial/like)
         category: Categoria do livro (busca exata ou parcial)
+        rating: Rating exato do livro
+        min_price: Preço mínimo
+        max_price: Preço máximo
     
     Returns:
         Lista de livros que atendem aos critérios
     """
-    query = db.query(Book)
-    
-    if title and title.strip():
-        query = query.filter(Book.titulo.ilike(f"%{title.strip()}%"))
-    
-    if category and category.strip():
-        query = query.filter(Book.categoria.ilike(f"%{category.strip()}%"))
-    
+    query = _search_query(db, title, category, rating, min_price, max_price)
     return query.order_by(Book.titulo).all()
 
+def faceted_search_books(
+    db: Session,
+    title: str = None,
+    category: str = None,
+    rating: int = None,
+    min_price: float = None,
+    max_price: float = None,
+    page: int = 1,
+    page_size: int = 20,
+    bucket_size: int = 10,
+):
+    """
+    Busca facetada: página de resultados + contagens por categoria, rating e faixa de preço
+
+    As contagens de todas as facetas (e o total) saem de uma única consulta
+    com GROUPING SETS sobre o conjunto filtrado.
+
+    Returns:
+        Dicionário com total, livros da página e facetas
+    """
+    query = _search_query(db, title, category, rating, min_price, max_price)
+
+    # Literal inteiro para que SELECT e GROUP BY tenham a mesma expressão
+    bucket_size = int(bucket_size)
+    bucket = func.floor(Book.preco / literal_column(str(bucket_size))) * literal_column(str(bucket_size))
+
+    facet_rows = (
+        query.with_entities(
+            Book.categoria,
+            Book.rating,
+            bucket.label("faixa"),
+            func.grouping(Book.categoria).label("sem_categoria"),
+            func.grouping(Book.rating).label("sem_rating"),
+            func.grouping(bucket).label("sem_faixa"),
+            func.count(Book.id).label("total"),
+        )
+        .group_by(
+            func.grouping_sets(
+                tuple_(Book.categoria),
+                tuple_(Book.rating),
+                tuple_(bucket),
+                tuple_(),
+            )
+        )
+        .all()
+    )
+
+    total, facets = _decode_facets(facet_rows, bucket_size, min_price, max_price)
+
+    books = []
+    if total:
+        books = (
+            query.order_by(Book.titulo, Book.id)
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+            .all()
+        )
+
+    return {
+        "total": total,
+        "books": books,
+        "facets": facets,
+    }
+
+def _decode_facets(facet_rows, bucket_size: int, min_price: float = None, max_price: float = None):
+    """
+    Separa as linhas do GROUPING SETS em total e facetas.
+
+    Cada linha vem de um único conjunto: as flags sem_* (GROUPING() = 1) indicam
+    quais colunas não fazem parte do agrupamento daquela linha.
+
+    As faixas de preço são [min, max) e têm os limites ajustados aos filtros
+    de preço aplicados (ex.: com max=40 a faixa de 40 vira 40–40).
+    """
+    total = 0
+    categories, ratings, price_buckets = {}, {}, []
+    for row in facet_rows:
+        if not row.sem_categoria:
+            categories[row.categoria] = row.total
+        elif not row.sem_rating:
+            ratings[str(row.rating)] = row.total
+        elif not row.sem_faixa:
+            start = float(row.faixa)
+            end = start + bucket_size
+            if min_price is not None:
+                start = max(start, float(min_price))
+            if max_price is not None:
+                end = min(end, float(max_price))
+            price_buckets.append({"min": start, "max": end, "total": row.total})
+        else:
+            total = row.total
+
+    return total, {
+        "categories": dict(sorted(categories.items())),
+        "ratings": dict(sorted(ratings.items())),
+        "price_buckets": sorted(price_buckets, key=lambda b: b["min"]),
+    }
+
+def get_book_changes(db: Session, since: int = 0, limit: int = 500):
+    """
+    Retorna as alterações de livros com versão maior que `since`
+
+    Args:
+        db: Sessão do banco de dados
+        since: Última versão já sincronizada pelo cliente
+        limit: Quantidade máxima de alterações retornadas
+
+    Returns:
+        Tupla (alterações ordenadas por versão, há mais alterações, próxima versão)
+    """
+    # Uma única instrução (um único snapshot) para livros e remoções: com duas
+    # consultas, um commit do scraper entre elas poderia fazer o cliente pular versões
+    books_sel = select(
+        Book.id.label("id"),
+        Book.versao.label("versao"),
+        Book.updated_at.label("updated_at"),
+        false().label("removido"),
+    ).where(Book.versao > since)
+    tombstones_sel = select(
+        BookTombstone.id.label("id"),
+        BookTombstone.versao.label("versao"),
+        BookTombstone.updated_at.label("updated_at"),
+        true().label("removido"),
+    ).where(BookTombstone.versao > since)
+    changes = union_all(books_sel, tombstones_sel).subquery()
+
+    rows = db.execute(
+        select(changes).order_by(changes.c.versao).limit(limit + 1)
+    ).all()
+
+    book_ids = [row.id for row in rows[:limit] if not row.removido]
+    books_by_id = {}
+    if book_ids:
+        books_by_id = {b.id: b for b in db.query(Book).filter(Book.id.in_(book_ids)).all()}
+
+    return _page_changes(rows, books_by_id, since, limit)
+
+def _page_changes(rows, books_by_id, since: int, limit: int):
+    """
+    Monta a página de alterações a partir das linhas (id, versao, updated_at, removido)
+    já ordenadas por versão, com até `limit + 1` linhas
+    """
+    page = rows[:limit]
+    changes = []
+    for row in page:
+        if row.removido:
+            changes.append(BookTombstone(id=row.id, versao=row.versao, updated_at=row.updated_at))
+        elif row.id in books_by_id:
+            changes.append(books_by_id[row.id])
+        # Livro removido depois da leitura: a remoção tem versão maior e vem numa próxima página
+
+    # next_since vem das linhas da página, mesmo as que não foram carregadas
+    next_since = page[-1].versao if page else since
+    return changes, len(rows) > limit, next_since
+
 def get_categories(db: Session):
     """SELECT DISTINCT categoria FROM books"""
     return [row[0] for row in db.query(Book.categoria).distinct().all()]
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional, Dict
+import datetime
+from typing import Optional, Dict, List
 
 class BookSchema(BaseModel):
     id: int
@@ -13,6 +14,20 @@ class BookSchema(BaseModel):
     class Config:
         orm_mode = True
 
+class BookChangeSchema(BaseModel):
+    id: int
+    versao: int
+    updated_at: datetime.datetime
+    removido: bool = False
+    livro: Optional[BookSchema] = None
+
+
+class BookChangesResponse(BaseModel):
+    since: int
+    next_since: int
+    has_more: bool
+    changes: List[BookChangeSchema]
+
 ##Desafio 2 (Pipelines de ML)
 class FeatureResponse(BaseModel):
     id: int
@@ -0,0 +1,38 @@
+from sqlalchemy import text
+from app.database import engine
+
+# Migração única para bancos criados antes do feed de alterações
+# (create_all não adiciona colunas em tabelas já existentes)
+STATEMENTS = [
+    "CREATE SEQUENCE IF NOT EXISTS books_versao_seq",
+    "ALTER TABLE books ADD COLUMN IF NOT EXISTS versao BIGINT",
+    "ALTER TABLE books ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP",
+    "UPDATE books SET versao = nextval('books_versao_seq') WHERE versao IS NULL",
+    "UPDATE books SET updated_at = now() WHERE updated_at IS NULL",
+    "ALTER TABLE books ALTER COLUMN versao SET DEFAULT nextval('books_versao_seq')",
+    "ALTER TABLE books ALTER COLUMN updated_at SET DEFAULT now()",
+    "ALTER TABLE books ALTER COLUMN versao SET NOT NULL",
+    "ALTER TABLE books ALTER COLUMN updated_at SET NOT NULL",
+    "CREATE INDEX IF NOT EXISTS ix_books_versao ON books (versao)",
+    """
+    CREATE TABLE IF NOT EXISTS book_tombstones (
+        id INTEGER PRIMARY KEY,
+        versao BIGINT NOT NULL DEFAULT nextval('books_versao_seq'),
+        updated_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_book_tombstones_versao ON book_tombstones (versao)",
+]
+
+
+def migrate():
+    print("Aplicando migração de versões...")
+    # Tudo em uma transação: ou o banco fica migrado, ou nada muda
+    with engine.begin() as conn:
+        for statement in STATEMENTS:
+            conn.execute(text(statement))
+    print("Migração concluída!")
+
+
+if __name__ == "__main__":
+    migrate()
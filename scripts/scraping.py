@@ -1,17 +1,76 @@
+import datetime
 import requests
 from bs4 import BeautifulSoup
+from sqlalchemy import text
 from app.database import SessionLocal
-from app.models import Book
+from app.models import Book, BookTombstone, versao_seq
+
+# Chave do advisory lock que serializa execuções do scraper
+SCRAPE_LOCK_KEY = 367414
+
+
+def _upsert_book(session, books_by_image, seen_ids, fields, next_versao=versao_seq.next_value):
+    """
+    Insere o livro ou atualiza o já salvo com a mesma capa.
+    A versão só avança quando algum campo realmente mudou.
+    """
+    existing = books_by_image.get(fields["imagem"])
+    if existing is None:
+        new_book = Book(**fields, versao=next_versao())
+        session.add(new_book)
+        books_by_image[fields["imagem"]] = new_book
+        return new_book
+
+    if existing.id is not None:
+        seen_ids.add(existing.id)
+    changed = False
+    for field, value in fields.items():
+        if getattr(existing, field) != value:
+            setattr(existing, field, value)
+            changed = True
+    if changed:
+        existing.versao = next_versao()
+        existing.updated_at = datetime.datetime.utcnow()
+    return existing
+
+
+def _remove_unseen_books(session, existing_books, seen_ids, completed, next_versao=versao_seq.next_value):
+    """
+    Remove os livros que não apareceram no scraping, registrando uma remoção para cada.
+    Nada é removido se o catálogo não foi percorrido por inteiro.
+    """
+    if not completed:
+        return []
+
+    removed = []
+    for book in existing_books:
+        if book.id not in seen_ids:
+            session.add(BookTombstone(id=book.id, versao=next_versao()))
+            session.delete(book)
+            removed.append(book)
+    return removed
 
 
 def scrape_books():
     url = "https://books.toscrape.com/catalogue/page-1.html"
     session = SessionLocal()
 
+    # Versões são distribuídas na escrita, não no commit: dois scrapes simultâneos
+    # poderiam commitar fora de ordem e o feed de alterações pularia linhas.
+    # O lock vale até o commit/rollback da transação.
+    session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCRAPE_LOCK_KEY})
+
+    # Livros já salvos, indexados pela URL da capa (única por livro no site)
+    existing_books = session.query(Book).all()
+    books_by_image = {b.imagem: b for b in existing_books}
+    seen_ids = set()
+    completed = True
+
     while url:
         response = requests.get(url)
         if response.status_code != 200:
             print(f"Erro ao acessar {url}")
+            completed = False
             break
 
         soup = BeautifulSoup(response.text, "html.parser")
@@ -33,15 +92,16 @@ def scrape_books():
             book_soup = BeautifulSoup(book_resp.text, "html.parser")
             category = book_soup.find("ul", class_="breadcrumb").find_all("a")[2].get_text(strip=True)
 
-            new_book = Book(
-                titulo=title,
-                preco=float(price),
-                disponibilidade=availability,
-                rating=rating_value,
-                categoria=category,
-                imagem=img_url
-            )
-            session.add(new_book)
+            fields = {
+                "titulo": title,
+                "preco": float(price),
+                "disponibilidade": availability,
+                "rating": rating_value,
+                "categoria": category,
+                "imagem": img_url,
+            }
+
+            _upsert_book(session, books_by_image, seen_ids, fields)
 
         print(f"Página processada: {url}")
 
@@ -57,6 +117,8 @@ def scrape_books():
         else:
             url = None
 
+    _remove_unseen_books(session, existing_books, seen_ids, completed)
+
     session.commit()
     session.close()
     print("Todos os livros foram salvos no banco")
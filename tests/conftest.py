@@ -0,0 +1,21 @@
+import pytest
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+
+
+@pytest.fixture
+def db():
+    # Tabelas geradas a partir dos modelos, sem os defaults específicos do PostgreSQL
+    # (nextval/now); nos testes a versão é sempre informada explicitamente
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        copy = table.to_metadata(metadata)
+        for column in copy.columns:
+            column.server_default = None
+    metadata.create_all(engine)
+
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
@@ -0,0 +1,212 @@
+from types import SimpleNamespace
+import pytest
+from app import repositories as repo
+from app.models import Book, BookTombstone
+
+
+def add_book(db, book_id, versao):
+    db.add(Book(
+        id=book_id,
+        titulo=f"Livro {book_id}",
+        preco=10.0,
+        disponibilidade="In stock",
+        rating=3,
+        categoria="Fiction",
+        imagem=f"https://books.toscrape.com/{book_id}.jpg",
+        versao=versao,
+    ))
+
+
+def add_tombstone(db, book_id, versao):
+    db.add(BookTombstone(id=book_id, versao=versao))
+
+
+@pytest.fixture
+def changes(db):
+    # Versões intercaladas: 1 livro, 2 remoção, 3 livro, 4 remoção, 5 livro
+    add_book(db, 1, 1)
+    add_tombstone(db, 2, 2)
+    add_book(db, 3, 3)
+    add_tombstone(db, 4, 4)
+    add_book(db, 5, 5)
+    db.commit()
+    return db
+
+
+def test_get_book_changes_merges_books_and_tombstones_in_version_order(changes):
+    rows, has_more, next_since = repo.get_book_changes(changes, since=0, limit=10)
+
+    assert [row.versao for row in rows] == [1, 2, 3, 4, 5]
+    assert [isinstance(row, BookTombstone) for row in rows] == [False, True, False, True, False]
+    assert has_more is False
+    assert next_since == 5
+
+
+def test_get_book_changes_limit_cutting_after_book(changes):
+    # A página termina num livro e a próxima alteração é uma remoção
+    rows, has_more, next_since = repo.get_book_changes(changes, since=0, limit=3)
+
+    assert [row.versao for row in rows] == [1, 2, 3]
+    assert has_more is True
+    assert next_since == 3
+
+
+def test_get_book_changes_limit_cutting_after_tombstone(changes):
+    # A página termina numa remoção e a próxima alteração é um livro
+    rows, has_more, next_since = repo.get_book_changes(changes, since=1, limit=1)
+
+    assert [row.versao for row in rows] == [2]
+    assert isinstance(rows[0], BookTombstone)
+    assert has_more is True
+    assert next_since == 2
+
+
+def test_get_book_changes_pages_cover_every_change_once(changes):
+    seen = []
+    since, has_more = 0, True
+    while has_more:
+        rows, has_more, since = repo.get_book_changes(changes, since=since, limit=2)
+        seen.extend(row.versao for row in rows)
+
+    assert seen == [1, 2, 3, 4, 5]
+
+
+def test_get_book_changes_exact_limit_has_no_more(changes):
+    rows, has_more, next_since = repo.get_book_changes(changes, since=0, limit=5)
+
+    assert len(rows) == 5
+    assert has_more is False
+    assert next_since == 5
+
+
+def test_get_book_changes_without_changes_keeps_since(changes):
+    rows, has_more, next_since = repo.get_book_changes(changes, since=5, limit=10)
+
+    assert rows == []
+    assert has_more is False
+    assert next_since == 5
+
+
+def test_page_changes_skips_book_deleted_after_read_but_keeps_next_since():
+    rows = [
+        SimpleNamespace(id=1, versao=1, updated_at=None, removido=False),
+        SimpleNamespace(id=2, versao=2, updated_at=None, removido=False),
+        SimpleNamespace(id=3, versao=3, updated_at=None, removido=True),
+    ]
+    book = SimpleNamespace(id=1, versao=1)
+
+    changes, has_more, next_since = repo._page_changes(rows, {1: book}, since=0, limit=2)
+
+    # O livro 2 sumiu entre as leituras; sua remoção (versão maior) vem na próxima página
+    assert changes == [book]
+    assert has_more is True
+    assert next_since == 2
+
+
+@pytest.fixture
+def catalog(db):
+    books = [
+        (1, "Python Básico", 15.0, 3, "Programming"),
+        (2, "Python Avançado", 45.0, 5, "Programming"),
+        (3, "Dom Casmurro", 25.0, 5, "Fiction"),
+        (4, "Memórias Póstumas", 40.0, 4, "Fiction"),
+    ]
+    for book_id, titulo, preco, rating, categoria in books:
+        db.add(Book(
+            id=book_id,
+            titulo=titulo,
+            preco=preco,
+            disponibilidade="In stock",
+            rating=rating,
+            categoria=categoria,
+            imagem=f"https://books.toscrape.com/{book_id}.jpg",
+            versao=book_id,
+        ))
+    db.commit()
+    return db
+
+
+def search_ids(db, **filters):
+    return sorted(book.id for book in repo.search_books(db, **filters))
+
+
+def test_search_books_filters_by_title_and_category(catalog):
+    assert search_ids(catalog, title="python") == [1, 2]
+    assert search_ids(catalog, category="fic") == [3, 4]
+    assert search_ids(catalog, title="python", category="fic") == []
+
+
+def test_search_books_filters_by_rating(catalog):
+    assert search_ids(catalog, rating=5) == [2, 3]
+
+
+def test_search_books_price_bounds_are_inclusive(catalog):
+    assert search_ids(catalog, min_price=25.0) == [2, 3, 4]
+    assert search_ids(catalog, max_price=40.0) == [1, 3, 4]
+    assert search_ids(catalog, min_price=25.0, max_price=40.0) == [3, 4]
+
+
+def test_search_books_combines_all_filters(catalog):
+    assert search_ids(catalog, title="python", rating=5, min_price=40.0, max_price=50.0) == [2]
+
+
+def facet_row(categoria=None, rating=None, faixa=None, total=0):
+    # Flags no formato de GROUPING(): 0 quando a coluna faz parte do conjunto
+    return SimpleNamespace(
+        categoria=categoria,
+        rating=rating,
+        faixa=faixa,
+        sem_categoria=int(categoria is None),
+        sem_rating=int(rating is None),
+        sem_faixa=int(faixa is None),
+        total=total,
+    )
+
+
+def test_decode_facets_splits_grouping_sets_rows():
+    rows = [
+        facet_row(categoria="Programming", total=2),
+        facet_row(categoria="Fiction", total=2),
+        facet_row(rating=5, total=2),
+        facet_row(rating=3, total=1),
+        facet_row(rating=4, total=1),
+        facet_row(faixa=40, total=2),
+        facet_row(faixa=10, total=1),
+        facet_row(faixa=20, total=1),
+        facet_row(total=4),
+    ]
+
+    total, facets = repo._decode_facets(rows, 10)
+
+    assert total == 4
+    assert facets["categories"] == {"Fiction": 2, "Programming": 2}
+    assert facets["ratings"] == {"3": 1, "4": 1, "5": 2}
+    assert facets["price_buckets"] == [
+        {"min": 10.0, "max": 20.0, "total": 1},
+        {"min": 20.0, "max": 30.0, "total": 1},
+        {"min": 40.0, "max": 50.0, "total": 2},
+    ]
+
+
+def test_decode_facets_empty_result_has_only_grand_total():
+    total, facets = repo._decode_facets([facet_row(total=0)], 10)
+
+    assert total == 0
+    assert facets == {"categories": {}, "ratings": {}, "price_buckets": []}
+
+
+def test_decode_facets_clamps_price_buckets_to_filters():
+    rows = [
+        facet_row(faixa=10, total=3),
+        facet_row(faixa=30, total=1),
+        facet_row(faixa=40, total=1),
+        facet_row(total=5),
+    ]
+
+    total, facets = repo._decode_facets(rows, 10, min_price=12.5, max_price=40.0)
+
+    assert facets["price_buckets"] == [
+        {"min": 12.5, "max": 20.0, "total": 3},
+        {"min": 30.0, "max": 40.0, "total": 1},
+        {"min": 40.0, "max": 40.0, "total": 1},
+    ]
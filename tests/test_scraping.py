@@ -0,0 +1,86 @@
+import itertools
+from app.models import Book, BookTombstone
+from scripts.scraping import _remove_unseen_books, _upsert_book
+
+
+def book_fields(imagem, preco=10.0):
+    return {
+        "titulo": "Livro",
+        "preco": preco,
+        "disponibilidade": "In stock",
+        "rating": 3,
+        "categoria": "Fiction",
+        "imagem": imagem,
+    }
+
+
+def saved_books(db):
+    db.add(Book(id=1, versao=1, **book_fields("capa-1.jpg")))
+    db.add(Book(id=2, versao=2, **book_fields("capa-2.jpg")))
+    db.commit()
+    books = db.query(Book).order_by(Book.id).all()
+    return books, {b.imagem: b for b in books}
+
+
+def test_upsert_book_keeps_versao_when_nothing_changed(db):
+    books, books_by_image = saved_books(db)
+    seen_ids = set()
+    updated_at = books[0].updated_at
+
+    _upsert_book(db, books_by_image, seen_ids, book_fields("capa-1.jpg"), itertools.count(100).__next__)
+    db.commit()
+
+    book = db.get(Book, 1)
+    assert book.versao == 1
+    assert book.updated_at == updated_at
+    assert seen_ids == {1}
+
+
+def test_upsert_book_bumps_versao_when_a_field_changed(db):
+    books, books_by_image = saved_books(db)
+    seen_ids = set()
+
+    _upsert_book(db, books_by_image, seen_ids, book_fields("capa-1.jpg", preco=12.5), itertools.count(100).__next__)
+    db.commit()
+
+    book = db.get(Book, 1)
+    assert book.preco == 12.5
+    assert book.versao == 100
+    assert db.get(Book, 2).versao == 2
+    assert seen_ids == {1}
+
+
+def test_upsert_book_inserts_unknown_cover_with_new_versao(db):
+    books, books_by_image = saved_books(db)
+    seen_ids = set()
+
+    _upsert_book(db, books_by_image, seen_ids, book_fields("capa-3.jpg"), itertools.count(100).__next__)
+    db.commit()
+
+    new_book = db.query(Book).filter(Book.imagem == "capa-3.jpg").one()
+    assert new_book.versao == 100
+    assert seen_ids == set()
+
+
+def test_remove_unseen_books_writes_tombstones_after_complete_crawl(db):
+    books, books_by_image = saved_books(db)
+
+    removed = _remove_unseen_books(db, books, {1}, True, itertools.count(100).__next__)
+    db.commit()
+
+    assert [b.id for b in removed] == [2]
+    assert db.get(Book, 2) is None
+    assert db.get(Book, 1) is not None
+    tombstone = db.get(BookTombstone, 2)
+    assert tombstone.versao == 100
+
+
+def test_remove_unseen_books_does_nothing_after_incomplete_crawl(db):
+    books, books_by_image = saved_books(db)
+
+    removed = _remove_unseen_books(db, books, {1}, False, itertools.count(100).__next__)
+    db.commit()
+
+    assert removed == []
+    assert db.query(BookTombstone).count() == 0
+    assert db.query(Book).count() == 2